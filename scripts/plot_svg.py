@@ -3,12 +3,30 @@ from __future__ import annotations
 
 import argparse
 import csv
+import io
 import os
 from typing import List, Tuple
 
+try:  # NumPy is optional; without it the CSV is parsed with csv.DictReader
+	import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+	np = None
+
+COLUMNS = ("n", "empirical_p", "theory_p")
+
 
 def read_csv(path: str) -> Tuple[List[int], List[float], List[float]]:
 	"""Parse CSV and extract n, empirical_p, and theory_p columns."""
+	if np is not None:
+		# np.loadtxt parses in C; genfromtxt was slower than DictReader on large sweeps
+		with open(path, "r", newline="") as f:
+			header = next(csv.reader(f), [])
+			has_rows = any(line.strip() for line in f)  # stops at the first data row
+		if not has_rows:  # loadtxt would warn on an empty body
+			return [], [], []
+		cols = [header.index(c) for c in COLUMNS]
+		arr = np.loadtxt(path, delimiter=",", skiprows=1, usecols=cols, ndmin=2)
+		return arr[:, 0].astype(int).tolist(), arr[:, 1].tolist(), arr[:, 2].tolist()
 	ns: List[int] = []
 	emp: List[float] = []
 	theory: List[float] = []
@@ -27,7 +45,8 @@ def normalize(xs: List[float], xmin: float, xmax: float) -> List[float]:
 
 
 def polyline(points: List[Tuple[float, float]], color: str, width: int = 2) -> str:
-	pts = " ".join(f"{x:.1f},{y:.1f}" for x, y in points)
+	# One bound %-format per point via map: no generator frame or tuple unpacking per point
+	pts = " ".join(map("%.1f,%.1f".__mod__, points))
 	return f'<polyline fill="none" stroke="{color}" stroke-width="{width}" points="{pts}" />'
 
 
@@ -63,27 +82,28 @@ def main() -> None:
 	points_emp = [to_px(xn, yn) for xn, yn in zip(xs, ys_emp)]
 	points_the = [to_px(xn, yn) for xn, yn in zip(xs, ys_the)]
 
-	# Axes and ticks
+	# Axes and ticks; elements are streamed into buffers (one per layer, since
+	# grid lines go below the curves and labels above) and written out once
 	ticks_x = 5
 	ticks_y = 5
-	grid = []
-	labels = []
+	grid = io.StringIO()
+	labels = io.StringIO()
 	# X axis
 	for i in range(ticks_x + 1):
 		xn = i / float(ticks_x)
 		x, y0 = to_px(xn, 0.0)
 		_, y1 = to_px(xn, 1.0)
-		grid.append(f'<line x1="{x:.1f}" y1="{y0:.1f}" x2="{x:.1f}" y2="{y1:.1f}" stroke="#eee" />')
+		grid.write(f'<line x1="{x:.1f}" y1="{y0:.1f}" x2="{x:.1f}" y2="{y1:.1f}" stroke="#eee" />\n')
 		val = int(round(xmin + xn * (xmax - xmin)))
-		labels.append(f'<text x="{x:.1f}" y="{H - 20}" font-size="12" text-anchor="middle" fill="#444">{val}</text>')
+		labels.write(f'<text x="{x:.1f}" y="{H - 20}" font-size="12" text-anchor="middle" fill="#444">{val}</text>\n')
 	# Y axis
 	for i in range(ticks_y + 1):
 		yn = i / float(ticks_y)
 		x0, y = to_px(0.0, yn)
 		x1, _ = to_px(1.0, yn)
-		grid.append(f'<line x1="{x0:.1f}" y1="{y:.1f}" x2="{x1:.1f}" y2="{y:.1f}" stroke="#eee" />')
+		grid.write(f'<line x1="{x0:.1f}" y1="{y:.1f}" x2="{x1:.1f}" y2="{y:.1f}" stroke="#eee" />\n')
 		val = ymin + yn * (ymax - ymin)
-		labels.append(f'<text x="{PAD_L - 8}" y="{y + 4:.1f}" font-size="12" text-anchor="end" fill="#444">{val:.3f}</text>')
+		labels.write(f'<text x="{PAD_L - 8}" y="{y + 4:.1f}" font-size="12" text-anchor="end" fill="#444">{val:.3f}</text>\n')
 
 	title = '<text x="400" y="18" font-size="16" text-anchor="middle" fill="#222">Bloom Filter False Positive Rate</text>'
 	xlab = f'<text x="{(PAD_L + plot_w/2):.1f}" y="{H - 5}" font-size="13" text-anchor="middle" fill="#222">n (inserted items)</text>'
@@ -96,21 +116,20 @@ def main() -> None:
 		'<text x="620" y="66" font-size="12" fill="#333">Theoretical</text>'
 	)
 
-	content = "\n".join([
-		f'<svg xmlns="http://www.w3.org/2000/svg" width="{W}" height="{H}" viewBox="0 0 {W} {H}">',
-		'<rect width="100%" height="100%" fill="#ffffff"/>',
-		title,
-		*grid,
-		polyline(points_emp, "#1f77b4", 3),
-		polyline(points_the, "#ff7f0e", 3),
-		*labels,
-		xlab,
-		ylab,
-		legend,
-		"</svg>",
-	])
+	buf = io.StringIO()
+	buf.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{W}" height="{H}" viewBox="0 0 {W} {H}">\n')
+	buf.write('<rect width="100%" height="100%" fill="#ffffff"/>\n')
+	buf.write(title + "\n")
+	buf.write(grid.getvalue())
+	buf.write(polyline(points_emp, "#1f77b4", 3) + "\n")
+	buf.write(polyline(points_the, "#ff7f0e", 3) + "\n")
+	buf.write(labels.getvalue())
+	buf.write(xlab + "\n")
+	buf.write(ylab + "\n")
+	buf.write(legend + "\n")
+	buf.write("</svg>")
 	with open(args.out, "w") as f:
-		f.write(content)
+		f.write(buf.getvalue())
 	print(f"Wrote {args.out}")
 
 
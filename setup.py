@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""Build the optional Cython core: `python setup.py build_ext --inplace`.
+
+BloomFilter works without it; when src/_bloom_core is importable the scalar
+add/contains paths delegate to it.
+"""
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+setup(
+	name="bloom-filter",
+	ext_modules=cythonize(
+		[Extension("src._bloom_core", ["src/_bloom_core.pyx"])],
+		language_level=3,
+	),
+)
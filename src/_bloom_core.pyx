@@ -0,0 +1,78 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Cython core for the BloomFilter scalar hot paths (optional extension).
+
+Build in place with `python setup.py build_ext --inplace`. _Core shares the
+filter's bytearray and computes the same blocked enhanced double hashing
+indices as BloomFilter._compute_indices, with the bit loop in C. Hashing
+stays in the Python-level `hash_pair` callable so both builds derive
+identical indices.
+"""
+from cpython.mem cimport PyMem_Free, PyMem_Malloc
+from libc.stdint cimport uint64_t
+
+
+cdef class _Core:
+	cdef unsigned char[::1] bits
+	cdef uint64_t num_blocks
+	cdef uint64_t block_bits
+	cdef uint64_t mask
+	cdef Py_ssize_t num_hashes
+	cdef uint64_t* terms
+	cdef object hash_pair
+
+	def __cinit__(self, bytearray bits, uint64_t num_blocks, uint64_t block_bits, list terms, hash_pair):
+		self.terms = <uint64_t*> PyMem_Malloc(len(terms) * sizeof(uint64_t))
+		if self.terms == NULL:
+			raise MemoryError()
+
+	def __init__(self, bytearray bits, uint64_t num_blocks, uint64_t block_bits, list terms, hash_pair):
+		cdef Py_ssize_t i
+		self.bits = bits
+		self.num_blocks = num_blocks
+		self.block_bits = block_bits
+		self.mask = block_bits - 1
+		self.num_hashes = len(terms)
+		for i in range(self.num_hashes):
+			self.terms[i] = terms[i]
+		self.hash_pair = hash_pair
+
+	def __dealloc__(self):
+		PyMem_Free(self.terms)
+
+	cdef inline void _params(self, bytes payload, uint64_t* base, uint64_t* offset, uint64_t* step) except *:
+		cdef uint64_t h1, h2
+		h1, h2 = self.hash_pair(payload)
+		base[0] = (h1 % self.num_blocks) * self.block_bits
+		offset[0] = h2 & self.mask
+		step[0] = (h2 >> 32) & self.mask
+
+	cdef inline void _add(self, bytes payload) except *:
+		cdef uint64_t base, offset, step, idx
+		cdef Py_ssize_t i
+		self._params(payload, &base, &offset, &step)
+		for i in range(self.num_hashes):
+			idx = base + ((offset + <uint64_t> i * step + self.terms[i]) & self.mask)
+			self.bits[idx >> 3] |= <unsigned char> (1 << (idx & 7))
+
+	def add_bytes(self, bytes payload):
+		"""Set the k bits of payload."""
+		self._add(payload)
+
+	def add_many(self, items):
+		"""Add every str/bytes item; returns how many were added."""
+		cdef Py_ssize_t n = 0
+		for it in items:
+			self._add(it.encode("utf-8") if isinstance(it, str) else it)
+			n += 1
+		return n
+
+	def contains_bytes(self, bytes payload):
+		"""Return True if all k bits of payload are set."""
+		cdef uint64_t base, offset, step, idx
+		cdef Py_ssize_t i
+		self._params(payload, &base, &offset, &step)
+		for i in range(self.num_hashes):
+			idx = base + ((offset + <uint64_t> i * step + self.terms[i]) & self.mask)
+			if not (self.bits[idx >> 3] >> (idx & 7)) & 1:
+				return False
+		return True
@@ -0,0 +1,88 @@
+"""Numba kernels for the BloomFilter bulk paths.
+
+The kernels take per-item block parameters (uint64 arrays: block base bit,
+first in-block offset, step) plus the k enhanced double hashing terms, and
+walk the in-block indices with explicit loops that compile to tight native
+code. Without Numba the functions stay importable as plain Python
+(HAVE_NUMBA is False) and the filter uses its NumPy path instead.
+"""
+from __future__ import annotations
+
+try:  # Numba is optional
+	from numba import get_num_threads, njit, prange
+except ImportError:  # pragma: no cover - depends on the environment
+	njit = None
+	prange = range
+
+	def get_num_threads() -> int:
+		return 1
+
+try:
+	import numpy as np
+except ImportError:  # pragma: no cover - Numba always brings NumPy
+	np = None
+
+HAVE_NUMBA = njit is not None
+
+# Batches smaller than this are not worth fanning out across threads.
+PARALLEL_MIN_ITEMS = 1024
+
+
+def add_indices(bits, base, offset, step, terms, mask):
+	"""Set bits base[n] + ((offset[n] + i*step[n] + terms[i]) & mask) of every item n in bits (uint8[:])."""
+	one = bits.dtype.type(1)
+	for n in range(base.shape[0]):
+		walk = offset[n]
+		for i in range(terms.shape[0]):
+			idx = base[n] + ((walk + terms[i]) & mask)
+			bits[idx >> 3] |= one << (idx & 7)
+			walk = (walk + step[n]) & mask
+	return bits
+
+
+def add_indices_parallel(bits, base, offset, step, terms, mask, bounds):
+	"""add_indices with thread c handling only the items with bounds[c] <= base < bounds[c + 1].
+
+	bounds (uint64[:]) splits the filter at block edges and a block is whole
+	bytes, so no two threads ever read-modify-write the same byte. Each thread
+	scans every item's base, which is cheap next to the k bit updates.
+	"""
+	one = bits.dtype.type(1)
+	for c in prange(bounds.shape[0] - 1):
+		lo = bounds[c]
+		hi = bounds[c + 1]
+		for n in range(base.shape[0]):
+			if base[n] < lo or base[n] >= hi:
+				continue
+			walk = offset[n]
+			for i in range(terms.shape[0]):
+				idx = base[n] + ((walk + terms[i]) & mask)
+				bits[idx >> 3] |= one << (idx & 7)
+				walk = (walk + step[n]) & mask
+	return bits
+
+
+def block_bounds(num_blocks, block_bits, num_chunks):
+	"""Return num_chunks + 1 uint64 bit offsets cutting num_blocks blocks into contiguous ranges."""
+	return (np.arange(num_chunks + 1, dtype=np.uint64) * np.uint64(num_blocks) // np.uint64(num_chunks)) * np.uint64(block_bits)
+
+
+def contains_indices(bits, base, offset, step, terms, mask, out):
+	"""Write into out[n] (bool[:]) whether all k bits of item n are set."""
+	for n in range(base.shape[0]):
+		walk = offset[n]
+		hit = True
+		for i in range(terms.shape[0]):
+			idx = base[n] + ((walk + terms[i]) & mask)
+			if (bits[idx >> 3] >> (idx & 7)) & 1 == 0:
+				hit = False
+				break
+			walk = (walk + step[n]) & mask
+		out[n] = hit
+	return out
+
+
+if HAVE_NUMBA:
+	add_indices = njit(cache=True, boundscheck=False)(add_indices)
+	add_indices_parallel = njit(parallel=True, cache=True, boundscheck=False)(add_indices_parallel)
+	contains_indices = njit(cache=True, boundscheck=False)(contains_indices)
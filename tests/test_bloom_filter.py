@@ -1,9 +1,17 @@
+import copy
+import io
+import itertools
+import math
 import os
+import pickle
 import random
 import tempfile
 import unittest
+from unittest import mock
 
-from src.bloom_filter import BloomFilter
+from src import _bloom_kernels
+from src import bloom_filter
+from src.bloom_filter import BloomFilter, np
 
 
 class TestBloomFilter(unittest.TestCase):
@@ -49,7 +57,143 @@ class TestBloomFilter(unittest.TestCase):
 		empirical = false_pos / float(probes)
 		theory = bf.estimated_false_positive_rate(n_inserted=n)
 		# Allow some tolerance (stochastic)
-		self.assertLess(abs(empirical - theory), max(0.01, theory * 0.5))
+		self.assertLess(abs(empirical - theory), theory * 0.5)
+
+	def test_size_for_small_p(self):
+		for n, p in ((1000, 1e-8), (10**6, 1e-9)):
+			m = BloomFilter.size_for(n, p)
+			k = BloomFilter.optimal_num_hashes(m, n)
+			self.assertLessEqual(k, BloomFilter.MAX_HASHES)
+			self.assertLessEqual(BloomFilter(m, k).estimated_false_positive_rate(n), p)
+			self.assertLess(m, 2 * -n * math.log(p) / math.log(2) ** 2)  # under 2x the unblocked m
+		with self.assertRaises(ValueError):
+			BloomFilter.size_for(1000, 1e-15)
+		self.assertLessEqual(BloomFilter(512, 7).estimated_false_positive_rate(10**7), 1.0)
+
+	def test_optimal_num_hashes_rounds_up_to_blocks(self):
+		for num_bits, n in ((1023, 100), (1500, 100), (5000, 300)):
+			rounded = BloomFilter(num_bits, 1).num_bits
+			self.assertEqual(BloomFilter.optimal_num_hashes(num_bits, n), BloomFilter.optimal_num_hashes(rounded, n))
+
+	def test_bulk_matches_scalar(self):
+		n = 1500
+		m = BloomFilter.size_for(n, 0.01)
+		k = BloomFilter.optimal_num_hashes(m, n)
+		bulk = BloomFilter(m, k)
+		bulk.BULK_BATCH = 64  # exercise several batches
+		scalar = BloomFilter(m, k)
+		vals = [f"key-{i}" for i in range(n)]
+		bulk.insert_many(iter(vals))
+		for v in vals:
+			scalar.add(v)
+		self.assertEqual(bulk.to_bytes(), scalar.to_bytes())
+		self.assertEqual(bulk.count_inserted, n)
+		probes = vals[:100] + [f"probe-{i}" for i in range(1000)]
+		self.assertEqual(bulk.contains_many(probes), [p in scalar for p in probes])
+
+	@unittest.skipUnless(np is not None and _bloom_kernels.HAVE_NUMBA, "requires NumPy and Numba")
+	def test_kernels_match_numpy_path(self):
+		m = BloomFilter.size_for(1000, 0.01)
+		k = BloomFilter.optimal_num_hashes(m, 1000)
+		vals = [f"key-{i}" for i in range(1000)]
+		probes = vals[:50] + [f"probe-{i}" for i in range(500)]
+		jit = BloomFilter(m, k)
+		jit.insert_many(vals)
+		par = BloomFilter(m, k)
+		with mock.patch.object(_bloom_kernels, "PARALLEL_MIN_ITEMS", 0), mock.patch.object(_bloom_kernels, "get_num_threads", lambda: 4):
+			par.insert_many(vals)
+		self.assertEqual(par.to_bytes(), jit.to_bytes())
+		for chunks in (1, 3, 64):  # more chunks than blocks leaves some ranges empty
+			one = BloomFilter(m, k)
+			base, offset, step = one._block_params_bulk(vals)
+			bounds = _bloom_kernels.block_bounds(one.num_blocks, one.BLOCK_BITS, chunks)
+			self.assertEqual((bounds[0], bounds[-1]), (0, one.num_bits))
+			terms = np.array(one._edh_terms, dtype=np.uint64)
+			_bloom_kernels.add_indices_parallel(one._bits_np, base, offset, step, terms, np.uint64(511), bounds)
+			self.assertEqual(one.to_bytes(), jit.to_bytes())
+		with mock.patch.object(_bloom_kernels, "HAVE_NUMBA", False):
+			vec = BloomFilter(m, k)
+			vec.insert_many(vals)
+			self.assertEqual(vec.contains_many(probes), jit.contains_many(probes))
+		self.assertEqual(jit.to_bytes(), vec.to_bytes())
+
+	@unittest.skipUnless(bloom_filter._Core is not None, "requires the compiled src._bloom_core extension")
+	def test_core_matches_python(self):
+		m = BloomFilter.size_for(1000, 0.01)
+		k = BloomFilter.optimal_num_hashes(m, 1000)
+		vals = [f"key-{i}" for i in range(1000)]
+		probes = vals[:50] + [f"probe-{i}" for i in range(500)]
+		core = BloomFilter(m, k)
+		for v in vals:
+			core.add(v)
+		with mock.patch.object(bloom_filter, "_Core", None):
+			py = BloomFilter(m, k)
+		for v in vals:
+			py.add(v)
+		self.assertEqual(core.to_bytes(), py.to_bytes())
+		self.assertEqual([p in core for p in probes], [p in py for p in probes])
+
+	def test_bit_density(self):
+		bf = BloomFilter(512, 1)
+		self.assertEqual(bf.bit_density(), 0.0)
+		for i in (0, 7, 8, 511):
+			bf._set_bit(i)
+		self.assertEqual(bf.bit_density(), 4 / 512.0)
+
+	def test_indices_stay_in_one_block(self):
+		bf = BloomFilter(5000, 7)
+		self.assertEqual(bf.num_bits % BloomFilter.BLOCK_BITS, 0)
+		self.assertGreaterEqual(bf.num_bits, 5000)
+		for i in range(200):
+			idx = bf._compute_indices(f"key-{i}".encode())
+			self.assertEqual(len(idx), 7)
+			self.assertEqual(len({j // BloomFilter.BLOCK_BITS for j in idx}), 1)
+			self.assertEqual(list(bf._fast_indices(*bloom_filter._hash_pair(f"key-{i}".encode()))), idx)
+
+	def test_num_hashes_bounds(self):
+		with self.assertRaises(ValueError):
+			BloomFilter(512, BloomFilter.BLOCK_BITS + 1)
+		header = BloomFilter.MAGIC + bloom_filter.struct.pack("<BQQ", BloomFilter.VERSION, 512, 10**4)
+		with self.assertRaises(ValueError):
+			BloomFilter.from_bytes(header + bytes(64))
+		bf = BloomFilter(5000, BloomFilter.UNROLL_HASHES + 8)  # looped index functions
+		for i in range(50):
+			payload = f"key-{i}".encode()
+			bf.add(payload)
+			self.assertEqual(list(bf._fast_indices(*bloom_filter._hash_pair(payload))), bf._compute_indices(payload))
+			self.assertIn(payload, bf)
+
+	def test_deepcopy(self):
+		for core in {bloom_filter._Core, None}:
+			with self.subTest(core=core), mock.patch.object(bloom_filter, "_Core", core):
+				bf = BloomFilter(5000, 7)
+				bf.insert_many([f"key-{i}" for i in range(100)])
+				c = copy.deepcopy(bf)
+				self.assertEqual(c._core is None, core is None)
+				c.insert_many(["x"])
+				c.add("q")
+				self.assertIn("x", c)
+				self.assertIn("q", c)
+				self.assertEqual(c.contains_many(["x", "q"]), [True, True])
+				self.assertNotIn("x", bf)
+				self.assertGreater(c.bit_density(), bf.bit_density())
+				self.assertEqual(c.count_inserted, 102)
+
+	def test_pickle_roundtrip(self):
+		for core, k in itertools.product({bloom_filter._Core, None}, (7, BloomFilter.UNROLL_HASHES + 8)):
+			with self.subTest(core=core, k=k), mock.patch.object(bloom_filter, "_Core", core):
+				bf = BloomFilter(5000, k)
+				bf.insert_many([f"key-{i}" for i in range(100)])
+				c = pickle.loads(pickle.dumps(bf))
+				self.assertEqual(c.to_bytes(), bf.to_bytes())
+				self.assertEqual(c.count_inserted, 100)
+				self.assertEqual(c._core is None, core is None)
+				c.insert_many(["x"])
+				c.add("q")
+				self.assertEqual(c.contains_many(["x", "q", "key-0"]), [True, True, True])
+				self.assertIn("x", c)
+				self.assertGreater(c.bit_density(), bf.bit_density())
+				self.assertEqual(copy.deepcopy(c).to_bytes(), c.to_bytes())
 
 	def test_serde_roundtrip(self):
 		n = 500
@@ -68,6 +212,16 @@ class TestBloomFilter(unittest.TestCase):
 		self.assertEqual(bf2.num_bits, bf.num_bits)
 		self.assertEqual(bf2.num_hashes, bf.num_hashes)
 		self.assertGreater(bf2.bit_density(), 0.0)
+		self.assertEqual(bf2.bit_density(), bf.bit_density())
+		self.assertEqual(bf2.to_bytes(), bf.to_bytes())
+		buf = bytearray(b"prefix")
+		bf.to_bytes_into(buf)
+		self.assertEqual(bytes(buf[6:]), data)
+		bf3 = BloomFilter.from_bytes(memoryview(buf)[6:])
+		self.assertEqual(bf3.to_bytes(), data)
+		out = io.BytesIO()
+		bf.write_to(out)
+		self.assertEqual(out.getvalue(), data)
 
 
 if __name__ == "__main__":